@@ -67,6 +67,11 @@ import sys, getopt
 import math
 import time
 import csv
+import logging
+import atexit
+from itertools import islice
+from dataclasses import dataclass, field
+import numpy as np
 
 import cplex
 from cplex.exceptions import CplexError
@@ -74,11 +79,26 @@ from cplex.callbacks import IncumbentCallback
 from cplex.callbacks import HeuristicCallback
 from cplex.callbacks import UserCutCallback, LazyConstraintCallback
 
+logger = logging.getLogger(__name__) #  per-iteration progress messages
+
 largeInstances = False
+debug          = False #  write intermediate models to disk (slow)
 
 _INFTY    = sys.float_info.max
 _EPSI     = sys.float_info.epsilon
+_VIOL     = 1.0e-7 #  minimum violation for a cut to be added
+_GAP      = 1.0e-6 #  relative gap: final master gap and bendersDual stopping
+_DIV      = "-"*30
+#  summary of the Benders status, printed every 10 iterations
+_SUMMARY_FMT = (_DIV + "\nSummary BENDERS status :: \nTot Nr. Cuts so far =  %d"
+                "\nBest ub = \t %s\nBest lb = \t %s\n" + _DIV + "\n\n")
 inputfile = ""
+nativeBenders = False
+verbose   = False #  show the progress messages (logging level INFO)
+debugCuts = False #  give a name to the Benders cuts added to the master
+multiTree = False #  with -a 1, re-solve the master after every cut
+#  cplex models ended at exit (see _endCplex)
+_OPEN_CPX = []
 lbSummary = "lowerBounds.txt"
 ubSummary = "upperBounds.txt"
 
@@ -91,7 +111,22 @@ lLogic    = []
 lDemand   = []
 inout     = []
 
-startTime = time.time()
+
+@dataclass
+class BendersState:
+    """
+    State of a run, created in :func:`main` and passed to the algorithms
+    (rather than kept in module globals):
+
+    * yPool : keys (y as uint8 bytes) of the setup plans added as cuts
+    * ubBest, yBest : best upper bound and setup plan found
+    * startTime : start of the run (time.perf_counter())
+
+    """
+    yPool: set = field(default_factory=set)
+    ubBest: float = _INFTY
+    yBest: list = field(default_factory=list)
+    startTime: float = 0.0
 
 
 class BendersLazyConsCallback(LazyConstraintCallback):
@@ -121,7 +156,8 @@ class BendersLazyConsCallback(LazyConstraintCallback):
         # get data structure (self is the master)
         #  mip    = self.mip
         cpx    = self.cpx
-        cpx.write("callback.lp")
+        if debug:
+            cpx.write("callback.lp")
         worker = self.worker
         y_ilo  = self.y_ilo
         z_ilo  = self.z_ilo
@@ -137,22 +173,33 @@ class BendersLazyConsCallback(LazyConstraintCallback):
         if objMaster < bestUB:
             bestUB = objMaster
 
-        print("[{0:5d}] lb = {1:9.2f}; ub = {2:9.2f}".format(self.nIter,
-        bestLB, bestUB))
-
-        zHat = self.get_values(z_ilo)
-        ySol = [ self.get_values(y_ilo[j] for j in range(inp.nI)]
-
-        #  cutType, zSub = worker.solveSubDual(inp, ySol, zHat, y_ilo, z_ilo)
-        cutType, zSub = worker.solveSubPrimal(inp, ySol, zHat, y_ilo, z_ilo)
-
-        # add cut to the master
-        # NOTE: cplex makes a working copy of the master (to which I am not able to
-        # gain access.) The "cpx" object remains empty, without the extra cuts
-        self.add(constraint = worker.cutLhs,
-                 sense      = "L",
-                 rhs        = worker.cutRhs,
-                 use        = self.use_constraint.purge)
+        if self.nIter % self.printEvery == 0:
+            logger.info("[%5d] lb = %9.2f; ub = %9.2f", self.nIter, bestLB,
+                        bestUB)
+
+        #  fetch all the y_jt values with a single call, as an (nI, nP) array
+        zHat  = self.get_values(z_ilo)
+        yStar = np.fromiter(self.get_values(self.y_flat), dtype=np.float64,
+                            count=len(self.y_flat))
+        ySol  = yStar.reshape(self.nI, self.nP)
+
+        #  a setup plan whose cut was already added does not need a new
+        #  subproblem solve: the cut is kept by cplex (use_constraint.force)
+        #  and it is tight at that plan, so it cannot be violated again
+        yKey = np.rint(yStar).astype(np.uint8).tobytes()
+        if yKey not in self.yPool:
+            #  cutType, zSub = worker.solveSubDual(inp, ySol, zHat, y_ilo, z_ilo)
+            cutType, zSub = worker.solveSubPrimal(inp, ySol, zHat, y_ilo, z_ilo)
+
+            # add cut to the master, if violated by the current solution
+            # NOTE: cplex makes a working copy of the master (to which I am not able to
+            # gain access.) The "cpx" object remains empty, without the extra cuts
+            if worker.cutViolation(yStar, zHat) > _VIOL:
+                self.add(constraint = worker.cutLhs,
+                         sense      = "L",
+                         rhs        = worker.cutRhs,
+                         use        = self.use_constraint.force)
+                self.yPool.add(yKey)
 
         self.nIter += 1
 
@@ -187,9 +234,23 @@ def parseCommandLine(argv):
 
     -a algorithm   type of algorithm used:
 
+    -n native-benders  with Benders (-a 1 or -a 3), let cplex run its own
+    Benders algorithm on the SPL reformulation, instead of the Python
+    callbacks
+
+    -t multi-tree   with Benders (-a 1), run the multi-tree scheme of
+    :func:`bendersDual` (the master MIP is re-solved after every cut)
+    instead of the lazy constraint callback
+
+    -v verbose      print the progress of the Benders iterations
+
+    --debug-cuts    name the Benders cuts added to the master (cut.k,
+    inout.k), e.g., to inspect them in an lp file written with debug
+
     With respect to the type of algorithms that can be used, we have:
 
-        1.  Benders Decomposition
+        1.  Benders Decomposition (one tree, cuts in a lazy callback; with -t,
+            one master MIP per cut)
         2.  Lagrangean Relaxation
         3.  Dantzig-Wolfe
         4.  Cplex MIP solver
@@ -223,21 +284,26 @@ def parseCommandLine(argv):
     global cOne
     global nSolInPool
     global algo
+    global nativeBenders
+    global verbose
+    global debugCuts
+    global multiTree
 
     try:
-        opts, args = getopt.getopt(argv, "hi:u:c:z:o:p:a:",
-        ["help","ifile=","ucuts","cpercent","zeros","ones","pool", "algorithm"])
+        opts, args = getopt.getopt(argv, "hi:u:c:z:o:p:a:ntv",
+        ["help","ifile=","ucuts","cpercent","zeros","ones","pool", "algorithm",
+         "native-benders", "multi-tree", "verbose", "debug-cuts"])
     except getopt.GetoptError:
         print("Command Line Error. Usage : python cflp.py -i <inputfile> -u\
         <usercuts> -c <corridor width> -z <fix to zero> -o <fix to one> \
-        -p <pool> -a <algorithm BD, LR, DW, Cplex>")
+        -p <pool> -a <algorithm BD, LR, DW, Cplex> [-n] [-t] [-v] [--debug-cuts]")
         sys.exit(2)
 
     for opt, arg in opts:
         if opt in ("-h", "--help"):
             print("Usage : python cflp.py -i <inputfile> -u <usercuts> -c \
             <corridor width> -z <fix to zero> -o <fix to one> \
-            -a <algorithm - BD, LR, DW, Cplex>")
+            -a <algorithm - BD, LR, DW, Cplex> [-n] [-t] [-v] [--debug-cuts]")
             sys.exit()
         elif opt in ("-i", "--ifile"):
             inputfile = arg
@@ -253,6 +319,61 @@ def parseCommandLine(argv):
             nSolInPool  = int(arg)
         elif opt in ("-a", "--algorithm"):
             algo  = float(arg)
+        elif opt in ("-n", "--native-benders"):
+            nativeBenders = True
+        elif opt in ("-t", "--multi-tree"):
+            multiTree = True
+        elif opt in ("-v", "--verbose"):
+            verbose = True
+        elif opt == "--debug-cuts":
+            debugCuts = True
+
+def _endCplex():
+    """
+    Release the cplex environments created with :func:`newCplex` before the
+    interpreter shuts down (registered with atexit.)
+
+    """
+    for cpx in _OPEN_CPX:
+        cpx.end()
+
+atexit.register(_endCplex)
+
+def cplexStream():
+    """
+    Stream of the cplex log and results of the masters and MIP models:
+    stdout with -v, none otherwise (the worker LPs are always silent.)
+
+    """
+    return sys.stdout if verbose else None
+
+def newCplex():
+    """
+    Create a cplex model, whose environment is ended at exit.
+
+    """
+    cpx = cplex.Cplex()
+    _OPEN_CPX.append(cpx)
+    return cpx
+
+def precompute(d, a, m, cap):
+    """
+    Compute the cumulative demand from t to T and the maximum production of
+    each item in each period. Arrays ``d``, ``a`` and ``m`` have shape
+    (nI, nP), while ``cap`` has shape (nP,).
+
+    """
+    #  cumulative demand (reversed cumsum over the periods)
+    # note : cum[v] gives the cumulative demand from v to T
+    # thus, cum[v] - cum[t] gives the cumulative demand between 
+    # v (included) and t (excluded)
+    dcum = np.cumsum(d[:, ::-1], axis=1)[:, ::-1]
+
+    # max production of item j in period t is the minimum between
+    # the limit set by capacity and the cumulative demand
+    max_prod = np.minimum((cap[None,:] - m)/a, dcum)
+
+    return dcum, max_prod
 
 class Instance:
     """
@@ -260,6 +381,11 @@ class Instance:
     Instances are obtained from Trigeiro. We also compute a tight value for the
     big M constant, as well as a cumulative demand value for t to T.
 
+    Once read, the instance data are kept as ``nI x nP`` float64 NumPy arrays
+    (``cap`` has length ``nP``). This holds for the cumulative demand ``dcum``
+    too, so that the demand between two periods, ``dcum[j, v] - dcum[j, t]``,
+    can also be taken over whole slices (e.g., ``dcum[:, v] - dcum[:, t]``).
+
     """
     def __init__(self, inputfile):
        self.d        = []
@@ -270,31 +396,25 @@ class Instance:
        self.m        = []
        self.max_prod = []
        self.cap      = []
-       self.dcum     = []
 
        if largeInstances == True:
            self.readLargeInstances(inputfile)
        else:
            self.readSmallInstances(inputfile)
 
-       #  compute cumulative demand
-       for j in range(self.nI):
-           aux = []
-           aux.append(self.d[j][self.nP-1])
-           progr = 0
-           for t in range(self.nP-2,-1,-1):
-               aux.append(aux[progr]+self.d[j][t])
-               progr += 1
-           self.dcum.append(list(reversed(aux)))
-           #  print("cum dem item ", j , " = ", self.dcum[j])
-
-
-       # max production of item j in period t is the minimum between
-       # the limit set by capacity and the cumulative demand
-       for j in range(self.nI):
-           aa = [( (self.cap[t] - self.m[j][t])/self.a[j][t]) for t in range(self.nP)]
-           self.max_prod.append([min(aa[t],self.dcum[j][t]) for t in \
-           range(self.nP)])
+       #  instance data as C-contiguous float64 arrays: (nI, nP), and (nP,)
+       #  for cap (d is read transposed, and would otherwise be a strided view)
+       self.d   = np.ascontiguousarray(self.d, dtype=np.float64)
+       self.c   = np.ascontiguousarray(self.c, dtype=np.float64)
+       self.f   = np.ascontiguousarray(self.f, dtype=np.float64)
+       self.h   = np.ascontiguousarray(self.h, dtype=np.float64)
+       self.a   = np.ascontiguousarray(self.a, dtype=np.float64)
+       self.m   = np.ascontiguousarray(self.m, dtype=np.float64)
+       self.cap = np.ascontiguousarray(self.cap, dtype=np.float64)
+
+       #  compute cumulative demand and max production
+       self.dcum, self.max_prod = precompute(self.d, self.a, self.m, self.cap)
+       #  print("cum dem = ", self.dcum)
            
     
     def readSmallInstances(self, inputfile):
@@ -308,93 +428,60 @@ class Instance:
 
             print("Nr. items and nr. periods = ", self.nI, " ", self.nP)
 
-            data = ff.readline()
-            self.cap = [float(v) for v in data.split()]*self.nP
+            self.cap = np.full(self.nP, np.loadtxt(ff, max_rows=1))
 
+            items = np.loadtxt(ff, max_rows=self.nI, ndmin=2)
             for i in range(self.nI):
-                data = ff.readline()
-                temp = [float(v) for v in data.split()]
+                temp = items[i]
                 #  a = temp[0]*self.nP;
-                a = [1.0]*self.nP
-                h = [temp[1]]*self.nP
-                m = [temp[2]]*self.nP
-                f = [temp[3]]*self.nP
-                c = [0.0]*self.nP
+                a = np.full(self.nP, 1.0)
+                h = np.full(self.nP, temp[1])
+                m = np.full(self.nP, temp[2])
+                f = np.full(self.nP, temp[3])
+                c = np.zeros(self.nP)
 
                 self.a.append(a)
                 self.h.append(h)
                 self.m.append(m)
                 self.f.append(f)
                 self.c.append(c)
-            self.d = [ [] for i in range(self.nI)]
-            for t in range(self.nP):
-                data = ff.readline()
-                temp = [float(v) for v in data.split()]
-                [self.d[i].append(temp[i]) for i in range(self.nI)]
-
-            #  compute cumulative demand
-            # note : cum[v] gives the cumulative demand from v to T
-            # thus, cum[v] - cum[t] gives the cumulative demand between 
-            # v (included) and t (excluded)
-            for j in range(self.nI):
-                aux = []
-                aux.append(self.d[j][self.nP-1])
-                progr = 0
-                for t in range(self.nP-2,-1,-1):
-                    aux.append(aux[progr]+self.d[j][t])
-                    progr += 1
-                self.dcum.append(list(reversed(aux)))
+            #  one row per period in the file, one row per item in self.d
+            self.d = np.loadtxt(ff, max_rows=self.nP, ndmin=2).T
 
     def readLargeInstances(self, inputfile):
         with open(inputfile) as ff:
             data = ff.readline()
             self.nI, self.nP = [int(v) for v in data.split()]
 
-            self.d = [ [] for i in range(self.nI)]
-
             print("We have ", self.nI, self.nP)
             #  setup costs
+            temp = np.loadtxt(ff, max_rows=self.nI, ndmin=2)
             for i in range(self.nI):
-                data = ff.readline()
-                temp = [float(v) for v in data.split()]
-                self.f.append([temp[1]]*self.nP)
+                self.f.append(np.full(self.nP, temp[i,1]))
             #  inventory holding costs
+            temp = np.loadtxt(ff, max_rows=self.nI, ndmin=2)
             for i in range(self.nI):
-                data = ff.readline()
-                temp = [float(v) for v in data.split()]
-                self.h.append([temp[1]]*self.nP)
+                self.h.append(np.full(self.nP, temp[i,1]))
             #  demand for each item in each period
-            for i in range(self.nI):
-                for t in range(self.nP):
-                    data = ff.readline()
-                    temp = [float(v) for v in data.split()]
-                    self.d[i].append(temp[2])
+            temp   = np.loadtxt(ff, max_rows=self.nI*self.nP, ndmin=2)
+            self.d = temp[:,2].reshape(self.nI, self.nP)
 
-            #  skip cumulative demand
-            for i in range(self.nI):
-                for t in range(self.nP):
-                    for tp in range(t, self.nP):
-                        data = ff.readline()
-            #  skip cumulative holding costs
-            for i in range(self.nI):
-                for t in range(self.nP):
-                    for tp in range(t, self.nP):
-                        data = ff.readline()
+            #  skip cumulative demand and cumulative holding costs (one
+            #  line per (i, t, tp) with tp >= t, in each of the two blocks)
+            nSkip = 2*self.nI*(self.nP*(self.nP+1))//2
+            next(islice(ff, nSkip, nSkip), None)
 
             #  resource usage a[j][t]
+            temp = np.loadtxt(ff, max_rows=self.nI, ndmin=2)
             for i in range(self.nI):
-                data = ff.readline()
-                temp = [float(v) for v in data.split()]
-                a = [temp[1]]*self.nP
+                a = np.full(self.nP, temp[i,1])
                 self.a.append(a)
-                self.m.append([0.0]*self.nP)
-                self.c.append([0.0]*self.nP)
+                self.m.append(np.zeros(self.nP))
+                self.c.append(np.zeros(self.nP))
 
 
-            for t in range(self.nP):
-                data = ff.readline()
-                temp = [float(v) for v in data.split()]
-                self.cap.append(temp[1])
+            temp = np.loadtxt(ff, max_rows=self.nP, ndmin=2)
+            self.cap = temp[:,1].tolist()
 
        #  compute cumulative demand
         #  for j in range(self.nI):
@@ -430,12 +517,8 @@ class MIP:
         self.zBest = cplex.infinity #  best solution so far
         self.z     = cplex.infinity # current solution
         self.ySol = []
-        y_ilo = []
-        x_ilo = []
-        s_ilo = []
-        sI    = []
 
-        cpx = cplex.Cplex()
+        cpx = newCplex()
         cpx.objective.set_sense(cpx.objective.sense.minimize)
         benders = cpx.long_annotations.add("cpxBendersPartition",1)
         objtype = cpx.long_annotations.object_type.variable
@@ -443,104 +526,94 @@ class MIP:
         cpx.parameters.benders.strategy.set(1)
         cpx.write_benders_annotation("benders.ann")
 
-        #  create variables y_jt
-        for j in range(inp.nI):
-            y_ilo.append([])
-            for t in range(inp.nP):
-                varName = "y." + str(j) + "." + str(t)
-                y_ilo[j].append(cpx.variables.get_num())
-                y_var = cpx.variables.add(obj   = [inp.f[j][t]],
-                                  lb    = [0],
-                                  ub    = [1],
-                                  types = ["B"],
-                                  names = [varName])
-                cpx.long_annotations.set_values(benders, objtype, [(i,0) for i in y_var])
-
+        nJT = inp.nI*inp.nP
+        JT  = [(j,t) for j in range(inp.nI) for t in range(inp.nP)]
 
+        #  create variables y_jt
+        base = cpx.variables.get_num()
+        y_ilo = [[base + j*inp.nP + t for t in range(inp.nP)] for j in range(inp.nI)]
+        cpx.variables.add(obj   = [inp.f[j][t] for j,t in JT],
+                          lb    = [0]*nJT,
+                          ub    = [1]*nJT,
+                          types = ["B"]*nJT,
+                          names = [f"y.{j}.{t}" for j,t in JT])
+        cpx.long_annotations.set_values(benders, objtype,
+                                        [(i,0) for i in range(base, base+nJT)])
 
         #  create variables x_jt
-        for j in range(inp.nI):
-            x_ilo.append([])
-            for t in range(inp.nP):
-                varName = "x." + str(j) + "." + str(t)
-                x_ilo[j].append(cpx.variables.get_num())
-                x_var= cpx.variables.add(obj   = [inp.c[j][t]],
-                                  lb    = [0.0],
-                                  ub    = [cplex.infinity],
-                                  types = ["C"],
-                                  names = [varName])
+        base = cpx.variables.get_num()
+        x_ilo = [[base + j*inp.nP + t for t in range(inp.nP)] for j in range(inp.nI)]
+        cpx.variables.add(obj   = [inp.c[j][t] for j,t in JT],
+                          lb    = [0.0]*nJT,
+                          ub    = [cplex.infinity]*nJT,
+                          types = ["C"]*nJT,
+                          names = [f"x.{j}.{t}" for j,t in JT])
 
         #  print("ANNOTATIONS :: ", cpx.long_annotations.get_values(benders,
         #  objtype))
 
         #  create variables s_jt
-        for j in range(inp.nI):
-            s_ilo.append([])
-            for t in range(inp.nP):
-                varName = "s." + str(j) + "." + str(t)
-                s_ilo[j].append(cpx.variables.get_num())
-                cpx.variables.add(obj   = [inp.h[j][t]],
-                                  lb    = [0.0],
-                                  ub    = [cplex.infinity],
-                                  types = ["C"],
-                                  names = [varName])
+        base = cpx.variables.get_num()
+        s_ilo = [[base + j*inp.nP + t for t in range(inp.nP)] for j in range(inp.nI)]
+        cpx.variables.add(obj   = [inp.h[j][t] for j,t in JT],
+                          lb    = [0.0]*nJT,
+                          ub    = [cplex.infinity]*nJT,
+                          types = ["C"]*nJT,
+                          names = [f"s.{j}.{t}" for j,t in JT])
 
         #  initial inventory level (avoid infeasibility)
-        for j in range(inp.nI):
-            varName = "sI." + str(j)
-            sI.append(cpx.variables.get_num())
-            cpx.variables.add(obj   = [100000],
-                              lb    = [0.0],
-                              ub    = [cplex.infinity],
-                              types = ["C"],
-                              names = [varName])
-
-        #  demand constraints
+        base = cpx.variables.get_num()
+        sI = [base + j for j in range(inp.nI)]
+        cpx.variables.add(obj   = [100000]*inp.nI,
+                          lb    = [0.0]*inp.nI,
+                          ub    = [cplex.infinity]*inp.nI,
+                          types = ["C"]*inp.nI,
+                          names = [f"sI.{j}" for j in range(inp.nI)])
+
+        #  demand constraints (same coefficients for every item and period:
+        #  production, inflow stock, minus outflow stock, except in the last)
+        valFlow    = [1.0, 1.0, -1.0]
+        valLast    = [1.0, 1.0]
+        demandExpr = []
+        demandRhs  = []
         for j in range(inp.nI):
             #  first period
             index = [x_ilo[j][0], sI[j], s_ilo[j][0]]
-            value = [1.0, 1.0, -1.0]
-            demand_constraint = cplex.SparsePair(ind=index, val=value)
-            cpx.linear_constraints.add(lin_expr = [demand_constraint],
-                                       senses   = ["E"],
-                                       rhs      = [inp.d[j][0]])
+            demandExpr.append(cplex.SparsePair(ind=index, val=valFlow))
+            demandRhs.append(inp.d[j][0])
             #  periods 2 to T-1
             for t in range(1,inp.nP-1):
                 index = [x_ilo[j][t], s_ilo[j][t-1], s_ilo[j][t]]
-                value = [1.0, 1.0, -1.0]
-                demand_constraint = cplex.SparsePair(ind=index, val=value)
-                cpx.linear_constraints.add(lin_expr = [demand_constraint],
-                                           senses   = ["E"],
-                                           rhs      = [inp.d[j][t]])
+                demandExpr.append(cplex.SparsePair(ind=index, val=valFlow))
+                demandRhs.append(inp.d[j][t])
 
             #  last period
             index = [x_ilo[j][inp.nP-1], s_ilo[j][inp.nP-2]]
-            value = [1.0, 1.0]
-            demand_constraint = cplex.SparsePair(ind=index, val=value)
-            cpx.linear_constraints.add(lin_expr = [demand_constraint],
-                                       senses   = ["E"],
-                                       rhs      = [inp.d[j][inp.nP-1]])
-
-        #  capacity constraints
+            demandExpr.append(cplex.SparsePair(ind=index, val=valLast))
+            demandRhs.append(inp.d[j][inp.nP-1])
+        cpx.linear_constraints.add(lin_expr = demandExpr,
+                                   senses   = ["E"]*len(demandExpr),
+                                   rhs      = demandRhs)
+
+        #  capacity constraints (column t of each nI x nP array)
+        x_arr = np.asarray(x_ilo)
+        y_arr = np.asarray(y_ilo)
+        capacityExpr = []
         for t in range(inp.nP):
-            index = [x_ilo[j][t] for j in range(inp.nI)]
-            value = [inp.a[j][t] for j in range(inp.nI)]
-            index = index + [y_ilo[j][t] for j in range(inp.nI)]
-            value = value + [inp.m[j][t] for j in range(inp.nI)]
-            capacity_constraint = cplex.SparsePair(ind=index, val=value)
-            cpx.linear_constraints.add(lin_expr = [capacity_constraint],
-                                       senses   = ["L"],
-                                       rhs      = [inp.cap[t]])
+            index = x_arr[:,t].tolist() + y_arr[:,t].tolist()
+            value = inp.a[:,t].tolist() + inp.m[:,t].tolist()
+            capacityExpr.append(cplex.SparsePair(ind=index, val=value))
+        cpx.linear_constraints.add(lin_expr = capacityExpr,
+                                   senses   = ["L"]*inp.nP,
+                                   rhs      = [inp.cap[t] for t in range(inp.nP)])
 
         #  logic constraints
-        for j in range(inp.nI):
-            for t in range(inp.nP):
-                index = [x_ilo[j][t], y_ilo[j][t]]
-                value = [1.0, -inp.max_prod[j][t]]
-                logic_constraint = cplex.SparsePair(ind =index, val=value)
-                cpx.linear_constraints.add(lin_expr = [logic_constraint],
-                                           senses   = ["L"],
-                                           rhs      = [0.0])
+        logicExpr = [cplex.SparsePair(ind=[x_ilo[j][t], y_ilo[j][t]],
+                                      val=[1.0, -inp.max_prod[j][t]])
+                     for j in range(inp.nI) for t in range(inp.nP)]
+        cpx.linear_constraints.add(lin_expr = logicExpr,
+                                   senses   = ["L"]*len(logicExpr),
+                                   rhs      = [0.0]*len(logicExpr))
 
         self.cpx   = cpx
         self.y_ilo = y_ilo
@@ -551,8 +624,8 @@ class MIP:
 
 
         
-    def solve(self, inp, nSol=99999, withPool=0, withPrinting=0, display=0,
-            timeLimit = 10000):
+    def solve(self, inp, state, nSol=99999, withPool=0, withPrinting=0,
+            display=0, timeLimit = 10000):
         """
         .. method:solve()
 
@@ -564,12 +637,9 @@ class MIP:
         * withPrinting: control the output
         * display : control cplex output
         * timeLimit : set a maximum time limit
+
+        The solution found is stored as the best one in state.
         """
-        global yRef
-        global ubBest
-        global yPool
-        global nPool
-        global startTime
 
         try:
 
@@ -591,11 +661,11 @@ class MIP:
         
         except CplexError as exc:
             print("CPLEX ERROR =", exc)
-            exit(999)
+            sys.exit(999)
 
-        self.getSolution(inp, withPrinting=2)
+        self.getSolution(inp, state, withPrinting=2)
 
-    def getSolution(self, inp, withPrinting=0):
+    def getSolution(self, inp, state, withPrinting=0):
 
         cpx = self.cpx
         y_ilo = self.y_ilo
@@ -603,7 +673,7 @@ class MIP:
         if withPrinting >= 1:
             print("STATUS = ", cpx.solution.status[cpx.solution.get_status()])
             print("OPT SOL found = ", cpx.solution.get_objective_value())
-            print("Time          = ", time.time() - startTime)
+            print("Time          = ", time.perf_counter() - state.startTime)
         #  if cpx.solution.get_status() == cpx.solution.status.optimal_tolerance\
             #  or cpx.solution.get_status() == cpx.solution.status.optimal:
         ubBest = cpx.solution.get_objective_value()
@@ -626,6 +696,8 @@ class MIP:
         # if self.z < self.zBest:
         #     self.zBest = self.z
         self.ySol = yRef
+        state.ubBest = ubBest
+        state.yBest  = yRef
 
         return ubBest
 
@@ -660,79 +732,77 @@ class MIPReformulation(MIP):
 
         self.zBest = cplex.infinity
         self.ySol = []
-        y_ilo = []
-        z_ilo = []
 
-        cpx = cplex.Cplex()
+        cpx = newCplex()
         cpx.objective.set_sense(cpx.objective.sense.minimize)
-        #  cpx.set_results_stream(None)
-        #  cpx.set_log_stream(None)
+        #  the cplex log is only shown with -v (warnings are always shown)
+        cpx.set_results_stream(cplexStream())
+        cpx.set_log_stream(cplexStream())
         cpx.parameters.benders.strategy.set(-1)
         cpx.write_benders_annotation("benders.ann")
         benders = cpx.long_annotations.add("cpxBendersPartition",1)
         objtype = cpx.long_annotations.object_type.variable
 
+        nJT = inp.nI*inp.nP
+        JT  = [(j,t) for j in range(inp.nI) for t in range(inp.nP)]
+
         #  create variables y_jt
-        for j in range(inp.nI):
-            y_ilo.append([])
-            for t in range(inp.nP):
-                varName = "y." + str(j) + "." + str(t)
-                y_ilo[j].append(cpx.variables.get_num())
-                y_var = cpx.variables.add(obj   = [inp.f[j][t]],
-                                  lb    = [0],
-                                  ub    = [1],
-                                  types = ["B"],
-                                  names = [varName])
-                cpx.long_annotations.set_values(benders, objtype, [(i,0) for i in y_var])
-
-        #  create variables z_jts
-        for j in range(inp.nI):
-            z_ilo.append([])
-            for t in range(inp.nP):
-                z_ilo[j].append([])
-                for r in range(t,inp.nP):
-                    varName = "z." + str(j) + "." + str(t) + "." + str(r)
-                    z_ilo[j][t].append(cpx.variables.get_num())
-                    z_var = cpx.variables.add(obj   = [(r-t)*inp.h[j][t]],
-                                      lb    = [0.0],
-                                      #  ub    = [cplex.infinity],
-                                      #  types = ["C"],
-                                      names = [varName])
+        base = cpx.variables.get_num()
+        y_ilo = [[base + j*inp.nP + t for t in range(inp.nP)] for j in range(inp.nI)]
+        cpx.variables.add(obj   = inp.f.ravel().tolist(),
+                          lb    = [0]*nJT,
+                          ub    = [1]*nJT,
+                          types = ["B"]*nJT,
+                          names = [f"y.{j}.{t}" for j,t in JT])
+        cpx.long_annotations.set_values(benders, objtype,
+                                        [(i,0) for i in range(base, base+nJT)])
+
+        #  create variables z_jtr (r >= t), with z_idx the dense copy of
+        #  their indices (-1 for r < t)
+        base   = cpx.variables.get_num()
+        tt, rr = np.triu_indices(inp.nP)
+        zObj   = ((rr - tt)[None,:]*inp.h[:, tt]).ravel().tolist()
+        z_idx  = np.full((inp.nI, inp.nP, inp.nP), -1, dtype=np.int32)
+        z_idx[:, tt, rr] = np.arange(base, base+len(zObj)).reshape(inp.nI, -1)
+        z_ilo  = [[z_idx[j, t, t:].tolist() for t in range(inp.nP)]
+                  for j in range(inp.nI)]
+        cpx.variables.add(obj   = zObj,
+                          lb    = [0.0]*len(zObj),
+                          #  ub    = [cplex.infinity],
+                          #  types = ["C"],
+                          names = [f"z.{j}.{t}.{r}" for j in range(inp.nI)
+                                   for t, r in zip(tt, rr)])
 
         #  demand constraints
-        for j in range(inp.nI):
-            for r in range(inp.nP):
-                index = [z_ilo[j][t][r-t] for t in range(r+1)]
-                value = [1.0]*(r+1)
-                demand_constraint = cplex.SparsePair(ind=index, val=value)
-                cpx.linear_constraints.add(lin_expr = [demand_constraint],
-                                           senses   = ["G"],
-                                           rhs      = [inp.d[j][r]])
-
-        #  capacity constraint
+        demandExpr = [cplex.SparsePair(ind=z_idx[j, :r+1, r].tolist(),
+                                       val=[1.0]*(r+1))
+                      for j in range(inp.nI) for r in range(inp.nP)]
+        cpx.linear_constraints.add(lin_expr = demandExpr,
+                                   senses   = ["G"]*len(demandExpr),
+                                   rhs      = inp.d.ravel().tolist())
+
+        #  capacity constraint: a_jt for the z_jtr, then m_jt for y_jt
+        capacityExpr = []
         for t in range(inp.nP):
             index = []
             value = []
             for j in range(inp.nI):
-                index += [z_ilo[j][t][r-t] for r in range(t,inp.nP)]
-                value += [inp.a[j][t]]*(inp.nP-t)
-                index += [y_ilo[j][t]]
-                value += [inp.m[j][t]]
-            capacity_constraint = cplex.SparsePair(ind=index,val=value)
-            cpx.linear_constraints.add(lin_expr  = [capacity_constraint],
-                                       senses    = ["L"],
-                                       rhs       = [inp.cap[t]])
+                index += z_ilo[j][t] + [y_ilo[j][t]]
+                value += [inp.a[j][t]]*(inp.nP-t) + [inp.m[j][t]]
+            capacityExpr.append(cplex.SparsePair(ind=index,val=value))
+        cpx.linear_constraints.add(lin_expr  = capacityExpr,
+                                   senses    = ["L"]*inp.nP,
+                                   rhs       = inp.cap.tolist())
 
         #  logic constraints
-        for j in range(inp.nI):
-            for t in range(inp.nP):
-                for r in range(t, inp.nP):
-                    index = [z_ilo[j][t][r-t], y_ilo[j][t]]
-                    value = [1.0, -inp.d[j][r]]
-                    logic_constraint = cplex.SparsePair(ind =index, val=value)
-                    cpx.linear_constraints.add(lin_expr = [logic_constraint],
-                                               senses   = ["L"],
-                                               rhs      = [0.0])
+        logicExpr = [cplex.SparsePair(ind=[z, y], val=[1.0, -dr])
+                     for z, y, dr in zip(z_idx[:, tt, rr].ravel().tolist(),
+                                         [y_ilo[j][t] for j in range(inp.nI)
+                                          for t in tt.tolist()],
+                                         inp.d[:, rr].ravel().tolist())]
+        cpx.linear_constraints.add(lin_expr = logicExpr,
+                                   senses   = ["L"]*len(logicExpr),
+                                   rhs      = [0.0]*len(logicExpr))
         #  #  cumulative logic constraints
         #  for j in range(inp.nI):
         #      for t in range(inp.nP):
@@ -804,17 +874,17 @@ def createMaster(inp, cpx):
     global y_ilo
     cpx.objective.set_sense(cpx.objective.sense.minimize)
 
+    nJT = inp.nI*inp.nP
+    JT  = [(j,t) for j in range(inp.nI) for t in range(inp.nP)]
+
     #  create variables y_jt
-    for j in range(inp.nI):
-        y_ilo.append([])
-        for t in range(inp.nP):
-            varName = "y." + str(j) + "." + str(t)
-            y_ilo[j].append(cpx.variables.get_num())
-            cpx.variables.add(obj   = [inp.f[j][t]],
-                              lb    = [0],
-                              ub    = [1],
-                              types = ["B"],
-                              names = [varName])
+    base = cpx.variables.get_num()
+    y_ilo.extend([[base + j*inp.nP + t for t in range(inp.nP)] for j in range(inp.nI)])
+    cpx.variables.add(obj   = [inp.f[j][t] for j,t in JT],
+                      lb    = [0]*nJT,
+                      ub    = [1]*nJT,
+                      types = ["B"]*nJT,
+                      names = [f"y.{j}.{t}" for j,t in JT])
 
     #  z_ilo.append(cpx.variables.get_num())
     z_ilo = cpx.variables.get_num()
@@ -825,11 +895,75 @@ def createMaster(inp, cpx):
                       names = ["zHat"])
 
 
-class WorkerLPPrimal:
+class BendersWorker:
+    """
+    Cut data shared by the two Benders workers. The vector of duals (or the
+    Farkas certificate) of :class:`WorkerLPPrimal` and the variables of
+    :class:`WorkerLPDual` have the same layout: lambda_t (capacity), then
+    omega_jr (demand), then eps_jtr (logic, r >= t), so the cuts are built
+    in the same way.
+
+    """
+    def _init_cut_buffers(self, inp):
+        """
+        Set the position of the eps_jtr in the dual vector and the work
+        arrays of the cuts, reused at every call (eps_jtr is zero for r < t).
+        The coefficient arrays are (nI, nP) views of the cut vectors; the last
+        entry of an optimality cut is the coefficient of zHat.
+
+        """
+        self.triu_t, self.triu_r = np.triu_indices(inp.nP)
+        self.eps_offset = inp.nP + inp.nI*inp.nP
+        self.eps_len    = inp.nI*inp.nP*(inp.nP+1)//2
+        self._eps           = np.zeros((inp.nI, inp.nP, inp.nP))
+        self._cut_vals_feas = np.empty(inp.nI*inp.nP)
+        self._cut_vals_opt  = np.empty(inp.nI*inp.nP + 1)
+        self._cut_vals_opt[-1] = -1.0
+        self._cut_coeff     = self._cut_vals_feas.reshape(inp.nI, inp.nP)
+        self._cut_coeff_opt = self._cut_vals_opt[:-1].reshape(inp.nI, inp.nP)
+
+    def cutCoefficients(self, inp, lambda_sol, epsFlat, sign, out=None):
+        """
+        Coefficients of the y_jt in the cut, i.e., sign*m_jt*lambda_t +
+        sum_{r>=t} d_jr*eps_jtr, where epsFlat holds the eps_jtr (r >= t) in
+        row order. The result is written in out, a (nI, nP) array (by default
+        a work array that is overwritten by the next call), and returned.
+
+        """
+        eps   = self._eps
+        coeff = self._cut_coeff if out is None else out
+        eps[:, self.triu_t, self.triu_r] = epsFlat.reshape(inp.nI, -1)
+        np.einsum("jtr,jr->jt", eps, inp.d, out=coeff)
+        coeff += sign*inp.m*lambda_sol[None,:]
+
+        return coeff
+
+    def cutViolation(self, yFlat, zHat):
+        """
+        Violation (lhs - rhs) of the last cut at the master solution
+        (yFlat, zHat), where yFlat lists the y_jt in flat_y order. zHat only
+        appears in an optimality cut (its coefficient is the last one.)
+
+        """
+        cutVals = self.cutLhs.val
+        lhs = float(np.dot(cutVals, np.append(yFlat, zHat)[:len(cutVals)]))
+
+        return lhs - self.cutRhs
+
+
+class WorkerLPPrimal(BendersWorker):
+    """
+    Benders subproblem, i.e., the SPL reformulation for a given setup plan
+    :math:`y`. The capacity constraints of every period involve all the items,
+    so the subproblem does not decompose into one LP per item: it is solved as
+    a single LP, whose dual values define one cut for the whole plan.
+    For the same reason, the shortest-path (Wagner-Whitin) closed form of the
+    uncapacitated single-item dual does not apply here.
+
+    """
     def __init__(self, inp):
 
-        cpx = cplex.Cplex()
-        z_ilo = []
+        cpx = newCplex()
 
         cpx.set_results_stream(None)
         cpx.set_log_stream(None)
@@ -841,61 +975,53 @@ class WorkerLPPrimal:
         cpx.parameters.preprocessing.reduce.set(0)
         #  cpx.parameters.lpmethod.set(cpx.parameters.lpmethod.values.primal)
         cpx.parameters.lpmethod.set(cpx.parameters.lpmethod.values.dual)
+        # Only the rhs changes between two solves: restart the dual simplex
+        # from the previous optimal basis (this is the cplex default, set here
+        # so that it is not lost if other parameters are changed.)
+        cpx.parameters.advance.set(1)
         cpx.objective.set_sense(cpx.objective.sense.minimize)
 
         #  create variables z_jtr
-        for j in range(inp.nI):
-            z_ilo.append([])
-            for t in range(inp.nP):
-                z_ilo[j].append([])
-                for r in range(t,inp.nP):
-                    varName = "z." + str(j) + "." + str(t) + "." + str(r)
-                    z_ilo[j][t].append(cpx.variables.get_num())
-                    cpx.variables.add(obj   = [(r-t)*inp.h[j][t]],
-                                      lb    = [0.0],
-                                      #  ub    = [cplex.infinity],
-                                      #  ub    = [inp.d[j][r]],
-                                      names = [varName])
-
-        
-        #  capacity constraint
-        for t in range(inp.nP):
-            index = []
-            value = []
-            for j in range(inp.nI):
-                index += [z_ilo[j][t][r-t] for r in range(t,inp.nP)]
-                value += [inp.a[j][t]]*(inp.nP-t)
-
-            constrName = "capacity." + str(t)
-            capacity_constraint = cplex.SparsePair(ind=index,val=value)
-            cpx.linear_constraints.add(lin_expr  = [capacity_constraint],
-                                       senses    = ["L"],
-                                       rhs       = [0.0],
-                                       names     = [constrName])
-
-        #  demand constraints
-        for j in range(inp.nI):
-            for r in range(inp.nP):
-                index = [z_ilo[j][t][r-t] for t in range(r+1)]
-                value = [1.0]*(r+1)
-                constrName = "demand." + str(j) + "." + str(r)
-                demand_constraint = cplex.SparsePair(ind=index, val=value)
-                cpx.linear_constraints.add(lin_expr = [demand_constraint],
-                                           senses   = ["E"],
-                                           rhs      = [inp.d[j][r]],
-                                           names    = [constrName])
-        #  logic constraints
-        for j in range(inp.nI):
-            for t in range(inp.nP):
-                for r in range(t, inp.nP):
-                    index = [z_ilo[j][t][r-t]]
-                    value = [1.0]
-                    logic_constraint = cplex.SparsePair(ind =index, val=value)
-                    constrName = "logic."+str(j)+"."+str(t)+"."+str(r)
-                    cpx.linear_constraints.add(lin_expr = [logic_constraint],
-                                               senses   = ["L"],
-                                               rhs      = [0.0],
-                                               names    = [constrName])
+        #  NOTE: the worker rows and columns are not named: they are only
+        #  accessed by index (see z_idx, capIdx and logicIdx below)
+        base   = cpx.variables.get_num()
+        tt, rr = np.triu_indices(inp.nP)
+        #  holding cost of producing in t for period r: (r-t)*h_jt
+        zObj   = ((rr - tt)[None,:]*inp.h[:, tt]).ravel().tolist()
+        cpx.variables.add(obj   = zObj,
+                          #  ub    = [cplex.infinity],
+                          #  ub    = [inp.d[j][r]],
+                          lb    = [0.0]*len(zObj))
+        # dense copy of the z_jtr indices, with -1 for r < t
+        z_idx  = np.full((inp.nI, inp.nP, inp.nP), -1, dtype=np.int32)
+        z_idx[:, tt, rr] = np.arange(base, base+len(zObj)).reshape(inp.nI, -1)
+
+        #  all the rows are added with a single call:
+        #  capacity constraints (one per t):  sum_j sum_{r>=t} a_jt*z_jtr <= .
+        #  demand constraints (one per j,r):  sum_{t<=r} z_jtr = d_jr
+        #  logic constraints (one per j,t,r): z_jtr <= .
+        #  (the capacity and logic rhs depend on y and are set in solveSubPrimal)
+        capacityExpr = [cplex.SparsePair(ind=z_idx[:, t, t:].ravel().tolist(),
+                                         val=np.repeat(inp.a[:, t],
+                                                       inp.nP-t).tolist())
+                        for t in range(inp.nP)]
+        demandExpr = [cplex.SparsePair(ind=z_idx[j, :r+1, r].tolist(),
+                                       val=[1.0]*(r+1))
+                      for j in range(inp.nI) for r in range(inp.nP)]
+        logicExpr = [cplex.SparsePair(ind=[z], val=[1.0])
+                     for z in z_idx[:, tt, rr].ravel().tolist()]
+        nDemand = len(demandExpr)
+        nLogic  = len(logicExpr)
+
+        capIdx   = cpx.linear_constraints.get_num()
+        logicIdx = capIdx + inp.nP + nDemand
+        cpx.linear_constraints.add(lin_expr = capacityExpr + demandExpr +
+                                              logicExpr,
+                                   senses   = ["L"]*inp.nP + ["E"]*nDemand +
+                                              ["L"]*nLogic,
+                                   rhs      = [0.0]*inp.nP +
+                                              inp.d.ravel().tolist() +
+                                              [0.0]*nLogic)
 
         #  #  cumulative logic constraints
         #  for j in range(inp.nI):
@@ -909,47 +1035,30 @@ class WorkerLPPrimal:
         #                                     rhs      = [0.0],
         #                                     names    = [constrName])
 
-        # define labels for constraints (used in separation to get dual values)
-        lCapacity = ["capacity." + str(t) for t in range(inp.nP)]
-        lDemand   = [["demand." + str(j) + "." + str(r) for r in \
-                      range(inp.nP)] for j in range(inp.nI)]
-        lLogic    = [[["logic." + str(j) + "." + str(t) + "." + str(r) for r in\
-                      range(t,inp.nP)] for t in range(inp.nP)] for j in \
-                      range(inp.nI)]
-        #  lcumLogic = [["cumLogic." + str(j) + "." + str(t) for t in\
-        #                range(inp.nP)] for j in range(inp.nI)]
-
 
         self.cpx       = cpx
-        self.z_ilo     = z_ilo
-        self.lCapacity = lCapacity
-        self.lDemand   = lDemand
-        self.lLogic    = lLogic
-        #  self.lcumLogic = lcumLogic
+        self.z_idx     = z_idx
+        # row indices used to update the rhs (same order as the rows above)
+        self.capIdx    = list(range(capIdx, capIdx + inp.nP))
+        self.logicIdx  = list(range(logicIdx, logicIdx + nLogic))
+        self._init_cut_buffers(inp)
 
     def solveSubPrimal(self, inp, ySol, zHat, y_ilo, z_ilo_master):
         
         cutType   = 0
         cpx       = self.cpx
-        z_ilo     = self.z_ilo
-        lCapacity = self.lCapacity
-        lDemand   = self.lDemand
-        lLogic    = self.lLogic
-        #  lcumLogic    = self.lcumLogic
+
+        yArr     = np.ascontiguousarray(ySol, dtype=np.float64)
 
         #  update rhs values : capacity constraints
-        for t in range(inp.nP):
-            sumY = sum([inp.m[j][t]*ySol[j][t] for j in range(inp.nI)])
-            constrName = "capacity." + str(t)
-            cpx.linear_constraints.set_rhs(constrName, (inp.cap[t]-sumY))
+        capRhs   = inp.cap - (inp.m*yArr).sum(axis=0)
 
-        #  update rhs values : logic constraints
-        for j in range(inp.nI):
-            for t in range(inp.nP):
-                for r in range(t, inp.nP):
-                    constrName = "logic." + str(j) + "." + str(t) + "." + str(r)
-                    rhsValue = inp.d[j][r]*ySol[j][t]
-                    cpx.linear_constraints.set_rhs(constrName, rhsValue)
+        #  update rhs values : logic constraints (d_jr * y_jt, with r >= t)
+        logicRhs = (yArr[:,:,None]*inp.d[:,None,:])[:, self.triu_t, self.triu_r]
+
+        cpx.linear_constraints.set_rhs(list(zip(self.capIdx, capRhs.tolist())) +
+                                       list(zip(self.logicIdx,
+                                                logicRhs.ravel().tolist())))
 
         #  #  update cumulative capacity
         #  for j in range(inp.nI):
@@ -971,80 +1080,50 @@ class WorkerLPPrimal:
             #  add extreme ray using Farkas certificate
             farkas, pp = cpx.solution.advanced.dual_farkas()
 
-            progr     = inp.nP
-            #  index     = range(progr)
-            #  fCapacity = [farkas[i] for i in index]
-            lambda_sol = [farkas[t] for t in range(inp.nP)]
+            farkas     = np.asarray(farkas, dtype=np.float64)
+            eps0       = self.eps_offset
+            lambda_sol = farkas[:inp.nP]
+            omega_sol  = farkas[inp.nP:eps0].reshape(inp.nI, inp.nP)
 
-            omega_sol = [[ farkas[k] for k in range(progr+j*inp.nP,\
-            progr+(j+1)*inp.nP)] for j in range(inp.nI)]
 
-            progr    += inp.nP*inp.nI
-            nr        = int( inp.nI*(inp.nP*(inp.nP+1))/2)
-            index     = range(progr, progr+nr)
-            fLogic    = [farkas[i] for i in index]
-            epsilon_sol = []
-            pp = 0
-            for j in range(inp.nI):
-                aux2D = []
-                for t in range(inp.nP):
-                    aux = []
-                    for r in range(t,inp.nP):
-                        aux.append(fLogic[pp])
-                        pp += 1
-                    aux2D.append(aux)
-                epsilon_sol.append(aux2D)
-
-            #  progr    += nr
+            #  progr     = eps0 + self.eps_len
             #  index     = range(progr, progr+inp.nI*inp.nP)
             #  fcumLogic = [farkas[i] for i in index]
 
             #  feasibility cut
-            cutRhs  = 0.0
-            for j in range(inp.nI):
-                for t in range(inp.nP):
-                    progr = j*inp.nP+t
-                    #  coeff  = inp.max_prod[j][t]*fcumLogic[progr]-\
-                    coeff  = -inp.m[j][t]*lambda_sol[t] + \
-                             sum([epsilon_sol[j][t][r-t]*inp.d[j][r] for r in \
-                             range(t,inp.nP)])
-
-                    cutRhs -= inp.d[j][t]*omega_sol[j][t]
-
-                    cutVars.append(y_ilo[j][t])
-                    cutVals.append(coeff)
-
-            cutRhs -= sum([inp.cap[t]*lambda_sol[t] for t in range(inp.nP)])
+            #  coeff  = inp.max_prod[j][t]*fcumLogic[progr]-\
+            coeff   = self.cutCoefficients(inp, lambda_sol,
+                                           farkas[eps0:eps0+self.eps_len], -1.0)
+            cutRhs  = -float((inp.d*omega_sol).sum()) - \
+                      float(inp.cap.dot(lambda_sol))
+            cutVars = list(self.flat_y)
+            cutVals = self._cut_vals_feas.tolist()
 
         elif cpx.solution.get_status() == cpx.solution.status.optimal:
             cutType = 2
             zSub = cpx.solution.get_objective_value()
             #  print("Getting OPTIMALITY cut [zDual* =", zSub,"]")
 
-            # get dual values
-            lambda_sol  = cpx.solution.get_dual_values(lCapacity)
-            omega_sol   = [cpx.solution.get_dual_values(lDemand[j]) for j in range(inp.nI)]
-            epsilon_sol = [[cpx.solution.get_dual_values(lLogic[j][t]) for t in range(inp.nP)] for j in range(inp.nI)]
+            # get dual values (all rows at once, same layout as the Farkas
+            # certificate; the demand duals are not needed)
+            duals      = np.asarray(cpx.solution.get_dual_values(),
+                                    dtype=np.float64)
+            eps0       = self.eps_offset
+            lambda_sol = duals[:inp.nP]
 
             #  nu_sol = [[cpx.solution.get_dual_values(lcumLogic[j][t]) for t in\
             #             range(inp.nP)] for j in range(inp.nI)]
 
             # generalized Benders cut
-            cutRhs = -zSub
-            for j in range(inp.nI):
-                for t in range(inp.nP):
-                    coeff = inp.m[j][t]*lambda_sol[t] \
-                             - sum([-epsilon_sol[j][t][r-t]*inp.d[j][r] for r
-                               in range(t, inp.nP)]) # -\
-                               #  -nu_sol[j][t]*inp.max_prod[j][t]
-
-                    cutVars.append(y_ilo[j][t])
-                    cutVals.append(coeff)
-
-                    cutRhs += coeff*ySol[j][t]
-
-            cutVars.append(z_ilo_master)
-            cutVals.append(-1.0)
+            #  (nu_sol[j][t]*inp.max_prod[j][t] would be subtracted here)
+            #  the coefficients are written straight into the cut vector, whose
+            #  last entry (the coefficient of zHat) is always -1
+            coeff   = self.cutCoefficients(inp, lambda_sol,
+                                           duals[eps0:eps0+self.eps_len], 1.0,
+                                           out=self._cut_coeff_opt)
+            cutRhs  = -zSub + float((coeff*yArr).sum())
+            cutVars = self.flat_y + [z_ilo_master]
+            cutVals = self._cut_vals_opt.tolist()
 
         #  return cut and type
         cutLhs = cplex.SparsePair(ind=cutVars, val=cutVals)
@@ -1054,7 +1133,7 @@ class WorkerLPPrimal:
 
         return cutType, zSub
 
-class WorkerLPDual:
+class WorkerLPDual(BendersWorker):
 
     def __init__(self, inp):
         """
@@ -1064,9 +1143,7 @@ class WorkerLPDual:
         identical to that of the optimal primal.
 
         """
-        cpx = cplex.Cplex()
-        l_ilo = []
-        w_ilo = []
+        cpx = newCplex()
         e_ilo = []
         #  v_ilo = []
 
@@ -1080,41 +1157,45 @@ class WorkerLPDual:
         cpx.parameters.preprocessing.reduce.set(0)
         cpx.parameters.lpmethod.set(cpx.parameters.lpmethod.values.primal)
         #  cpx.parameters.lpmethod.set(cpx.parameters.lpmethod.values.dual)
-        
+        # Only the objective changes between two solves: the previous optimal
+        # basis stays primal feasible, and the primal simplex restarts from it.
+        cpx.parameters.advance.set(1)
+
         cpx.objective.set_sense(cpx.objective.sense.maximize)
 
         # lambda variables (capacity constraints)
-        for t in range(inp.nP):
-            l_ilo.append(cpx.variables.get_num())
-            varName = "l." + str(t)
-            cpx.variables.add(obj   = [0.0], # to be changed
-                              lb    = [-cplex.infinity],
-                              ub    = [0.0],
-                              names = [varName])
+        base  = cpx.variables.get_num()
+        l_ilo = [base + t for t in range(inp.nP)]
+        cpx.variables.add(obj   = [0.0]*inp.nP, # to be changed
+                          lb    = [-cplex.infinity]*inp.nP,
+                          ub    = [0.0]*inp.nP,
+                          names = ["l." + str(t) for t in range(inp.nP)])
             
         # omega variables (demand constraints)
-        for j in range(inp.nI):
-            w_ilo.append([])
-            for t in range(inp.nP):
-                w_ilo[j].append(cpx.variables.get_num())
-                varName = "w." + str(j) + "." + str(t)
-                cpx.variables.add(obj   = [inp.d[j][t]],
-                                  #  lb    = [0.0],
-                                  names = [varName])
+        base  = cpx.variables.get_num()
+        w_ilo = [[base + j*inp.nP + t for t in range(inp.nP)] for j in
+                 range(inp.nI)]
+        cpx.variables.add(obj   = [inp.d[j][t] for j in range(inp.nI)
+                                   for t in range(inp.nP)],
+                          #  lb    = [0.0],
+                          names = ["w." + str(j) + "." + str(t) for j in
+                                   range(inp.nI) for t in range(inp.nP)])
 
 
         # epsilon variables (logical constraints)
+        base  = cpx.variables.get_num()
+        eName = []
         for j in range(inp.nI):
             e_ilo.append([])
             for t in range(inp.nP):
                 e_ilo[j].append([])
                 for r in range(t,inp.nP): #  NOTE: from t
-                    e_ilo[j][t].append(cpx.variables.get_num())
-                    varName = "e." + str(j) + "." + str(t) + "." + str(r)
-                    cpx.variables.add(obj    = [0.0], # to be  changed
-                              lb    = [-cplex.infinity],
-                                      ub     = [0.0],
-                                      names  = [varName])
+                    e_ilo[j][t].append(base + len(eName))
+                    eName.append("e." + str(j) + "." + str(t) + "." + str(r))
+        cpx.variables.add(obj    = [0.0]*len(eName), # to be  changed
+                          lb     = [-cplex.infinity]*len(eName),
+                          ub     = [0.0]*len(eName),
+                          names  = eName)
 
         #  # nu variables (cumulative logical constraints)
         #  for j in range(inp.nI):
@@ -1129,25 +1210,32 @@ class WorkerLPDual:
 
 
         # NOTE: Here w_ilo is with "r", not "j" !!!
+        dualExpr = []
+        dualName = []
         for j in range(inp.nI):
             for t in range(inp.nP):
                 for r in range(t, inp.nP):
-                    constrName = "dual." + str(j) + "." + str(t) + "." + str(r)
                     #  index = [w_ilo[j][r], l_ilo[t], v_ilo[j][t], e_ilo[j][t][r-t]]
                     #  value = [1.0, inp.a[j][t], 1.0, 1.0]
                     index = [w_ilo[j][r], l_ilo[t], e_ilo[j][t][r-t]]
                     value = [1.0, inp.a[j][t], 1.0]
-                    dual_constraint = cplex.SparsePair(ind=index,val=value)
-                    cpx.linear_constraints.add(lin_expr = [dual_constraint],
-                                               senses   = ["L"],
-                                               rhs      = [(r-t)*inp.h[j][t]],
-                                               names    = [constrName])
+                    dualExpr.append(cplex.SparsePair(ind=index,val=value))
+                    dualName.append("dual." + str(j) + "." + str(t) + "." + str(r))
+        #  rhs: holding cost (r-t)*h_jt of the primal z_jtr
+        tt, rr  = np.triu_indices(inp.nP)
+        dualRhs = ((rr - tt)[None,:]*inp.h[:, tt]).ravel().tolist()
+        cpx.linear_constraints.add(lin_expr = dualExpr,
+                                   senses   = ["L"]*len(dualExpr),
+                                   rhs      = dualRhs,
+                                   names    = dualName)
 
         self.cpx   = cpx
         self.l_ilo = l_ilo
         self.w_ilo = w_ilo
         self.e_ilo = e_ilo
+        self.e_flat = list(range(base, base + len(eName)))
         #  self.v_ilo = v_ilo
+        self._init_cut_buffers(inp)
 
 
     def solveSubDual(self, inp, ySol, zHat, y_ilo, z_ilo):
@@ -1165,20 +1253,14 @@ class WorkerLPDual:
 
         # update objective function coefficients of dual problem
         # lambda vars
-        for t in range(inp.nP):
-            coeff = inp.cap[t] - sum([inp.m[j][t]*ySol[j][t] for j in
-            range(inp.nI)])
-            #  for j in range(inp.nI):
-            #      coeff -= inp.m[j][t]*ySol[j][t]
-
-            cpx.objective.set_linear(l_ilo[t], coeff)
+        yArr  = np.ascontiguousarray(ySol, dtype=np.float64)
+        coeff = inp.cap - (inp.m*yArr).sum(axis=0)
+        cpx.objective.set_linear(list(zip(l_ilo, coeff.tolist())))
 
         # epsilon vars
-        for j in range(inp.nI):
-            for t in range(inp.nP):
-                for r in range(t, inp.nP):
-                    coeff = inp.d[j][r]*ySol[j][t]#NOTE: here it is "r", not "t"
-                    cpx.objective.set_linear(e_ilo[j][t][r-t], coeff)
+        #NOTE: here it is d_jr * y_jt, i.e., "r", not "t"
+        coeff = (yArr[:,:,None]*inp.d[:,None,:])[:, self.triu_t, self.triu_r]
+        cpx.objective.set_linear(list(zip(self.e_flat, coeff.ravel().tolist())))
         #  # nu vars
         #  for j in range(inp.nI):
         #      for t in range(inp.nP):
@@ -1200,41 +1282,15 @@ class WorkerLPDual:
 
         if cpx.solution.get_status() == cpx.solution.status.unbounded:
             cutType = 1
-            print("Dual unbounded, getting FEASIBILITY cut")
+            logger.info("Dual unbounded, getting FEASIBILITY cut")
             rays = cpx.solution.advanced.get_ray()
 
-            progr     = inp.nP
-            #  index     = range(progr)
-            #  fCapacity = [rays[i] for i in index]
-            #  lambda_sol = [fCapacity[t] for t in range(inp.nP)]
-            lambda_sol = [rays[i] for i in range(inp.nP)]
-            
-            #  index     = range(progr,progr+inp.nP*inp.nI)
-            #  fDemand   = [rays[i] for i in index]
-            #  omega_sol = []
-            #  for j in range(inp.nI):
-            #      omega_sol.append([fDemand[k] for k in range(j*inp.nP, (j+1)*inp.nP)])
-            omega_sol = [[ rays[k] for k in range(progr+j*inp.nP,\
-            progr+(j+1)*inp.nP)] for j in range(inp.nI)]
-
-            progr    += inp.nP*inp.nI
-            nr        = int( inp.nI*(inp.nP*(inp.nP+1))/2)
-            index = range(progr, progr + nr)
-            fLogic    = [rays[i] for i in index]
-            epsilon_sol = []
-            pp = 0
-            for j in range(inp.nI):
-                aux2D = []
-                for t in range(inp.nP):
-                    aux = []
-                    for r in range(t,inp.nP):
-                        aux.append(fLogic[pp])
-                        pp += 1
-                    aux2D.append(aux)
-                epsilon_sol.append(aux2D)
-
-            #  #  progr    += inp.nI*inp.nP*inp.nP
-            #  progr += nr
+            rays       = np.asarray(rays, dtype=np.float64)
+            eps0       = self.eps_offset
+            lambda_sol = rays[:inp.nP]
+            omega_sol  = rays[inp.nP:eps0].reshape(inp.nI, inp.nP)
+
+            #  progr = eps0 + self.eps_len
             #  index     = range(progr, progr+inp.nI*inp.nP)
             #  fcumLogic = [rays[i] for i in index]
             #  nu_sol = []
@@ -1242,57 +1298,33 @@ class WorkerLPDual:
             #      nu_sol.append([fcumLogic[k] for k in range(j*inp.nP, (j+1)*inp.nP)])
 
             # define cut
-            for j in range(inp.nI):
-                for t in range(inp.nP):
-                    coeff = -inp.m[j][t]*lambda_sol[t] +\
-                    sum([inp.d[j][r]*epsilon_sol[j][t][r-t] for t in range(inp.nP)])
-
-                    #  for r in range(t, inp.nP):
-                    #      coeff += inp.d[j][r]*epsilon_sol[j][t][r-t]
+            coeff   = self.cutCoefficients(inp, lambda_sol,
+                                           rays[eps0:eps0+self.eps_len], -1.0)
+            cutVars = list(self.flat_y)
+            cutVals = self._cut_vals_feas.tolist()
 
-                    cutVars.append(y_ilo[j][t])
-                    cutVals.append(coeff)
-
-            cutRhs = 0.0
-            for t in range(inp.nP):
-                cutRhs -= inp.cap[t]*lambda_sol[t]
-                for j in range(inp.nI):
-                    cutRhs -= inp.d[j][t]*omega_sol[j][t]
+            cutRhs  = -float(inp.cap.dot(lambda_sol)) - \
+                      float((inp.d*omega_sol).sum())
 
         elif cpx.solution.get_status() == cpx.solution.status.optimal:
             cutType = 2
             zSub = cpx.solution.get_objective_value()
-            print("Getting OPTIMALITY cut. [zDual* = ", zSub, "]")
-            lambda_sol = [cpx.solution.get_values(l_ilo[t]) for t in range(inp.nP)]
-            omega_sol = [ [cpx.solution.get_values(w_ilo[j][t]) for t in range(inp.nP)] for j in range(inp.nI)]
-            epsilon_sol = []
-            for j in range(inp.nI):
-                aux2D = []
-                for t in range(inp.nP):
-                    aux = []
-                    for r in range(t, inp.nP):
-                        aux.append(cpx.solution.get_values(e_ilo[j][t][r-t]))
-                    aux2D.append(aux)
-                epsilon_sol.append(aux2D)
+            logger.info("Getting OPTIMALITY cut. [zDual* =  %s ]", zSub)
+            # all the dual variables at once: lambda, omega, epsilon (the
+            # same layout as the ray; omega is not needed in the cut)
+            values     = np.asarray(cpx.solution.get_values(), dtype=np.float64)
+            eps0       = self.eps_offset
+            lambda_sol = values[:inp.nP]
 
             #  nu_sol = [ [cpx.solution.get_values(v_ilo[j][t]) for t in range(inp.nP)] for j in range(inp.nI)]
-        
-            # define cut
-            cutRhs = -zSub
-            for j in range(inp.nI):
-                for t in range(inp.nP):
-                    coeff = inp.m[j][t]*lambda_sol[t]
 
-                    for r in range(t, inp.nP):
-                        coeff += inp.d[j][r]*epsilon_sol[j][t][r-t]
-
-                    cutVars.append(y_ilo[j][t])
-                    cutVals.append(coeff)
-
-                    cutRhs += coeff*ySol[j][t]
-
-            cutVars.append(z_ilo)
-            cutVals.append(-1.0)
+            # define cut (the last entry of the cut vector, for zHat, is -1)
+            coeff   = self.cutCoefficients(inp, lambda_sol,
+                                           values[eps0:eps0+self.eps_len], 1.0,
+                                           out=self._cut_coeff_opt)
+            cutRhs  = -zSub + float((coeff*yArr).sum())
+            cutVars = self.flat_y + [z_ilo]
+            cutVals = self._cut_vals_opt.tolist()
 
 
         #  return cut and type
@@ -1304,9 +1336,28 @@ class WorkerLPDual:
         return cutType, zSub
 
 
+def restoreMILP(cpx, y_ilo):
+    """
+    Turn a model that was switched to LP back into a MILP, with binary setup
+    variables :math:`y` (the only integer variables of the models.)
+
+    """
+    cpx.set_problem_type(cpx.problem_type.MILP)
+    cpx.variables.set_types([(y, cpx.variables.type.binary) for row in y_ilo
+                             for y in row])
+
 def mipLPInterior(inp, mip):
+    """
+    Solve the LP relaxation of the MIP with barrier (no crossover.) The
+    problem type of mip.cpx is switched in place, rather than solving a clone,
+    and the MILP and its lp parameters are restored before returning.
+
+    """
     y_ilo = mip.y_ilo
-    cpxLP = cplex.Cplex(mip.cpx)
+    cpxLP = mip.cpx
+    params = cpxLP.parameters
+    saved  = [(p, p.get()) for p in [params.lpmethod, params.barrier.crossover,
+                                     params.barrier.convergetol]]
     print("Solving here for interior ... ")
     cpxLP.set_problem_type(cpxLP.problem_type.LP)
     print("Problem type is ", cpxLP.problem_type[cpxLP.get_problem_type()])
@@ -1322,11 +1373,14 @@ def mipLPInterior(inp, mip):
     #
     #  print(ySol)
     #  input(" ... barrier ... ")
+    restoreMILP(cpxLP, y_ilo)
+    for p, value in saved:
+        p.set(value)
     return ySol
 
 def barrierInit(inp):
 
-    cpx = cplex.Cplex()
+    cpx = newCplex()
     cpx.objective.set_sense(cpx.objective.sense.maximize)
     cpx.parameters.lpmethod.set(cpx.parameters.lpmethod.values.barrier)
     #  cpx.parameters.solutiontype.set(2)
@@ -1362,7 +1416,7 @@ def newIOCycle(cpx, worker, y_ilo, z_ilo, inp):
     cpx.parameters.simplex.display.set(0)
 
     #  print("Problem type is ", cpx.problem_type[cpx.get_problem_type()])
-    yTilde = [[1]*inp.nP]*inp.nI
+    yTilde = np.ones((inp.nI, inp.nP))
 
     stopping = False
     noImprov = 0
@@ -1374,7 +1428,7 @@ def newIOCycle(cpx, worker, y_ilo, z_ilo, inp):
         zLP = cpx.solution.get_objective_value()
         nrIter += 1
         if globalProgr % 50 == 0:
-            print("[{0:4d}] Best LB = {1:9.2f}; zLP = {2:9.2f}" .format(nrIter, bestLB, zLP))
+            logger.info("[%4d] Best LB = %9.2f; zLP = %9.2f", nrIter, bestLB, zLP)
 
         if zLP > bestLB:
             bestLB = zLP
@@ -1390,18 +1444,23 @@ def newIOCycle(cpx, worker, y_ilo, z_ilo, inp):
             noImprov = 0
 
         zHat = cpx.solution.get_values(z_ilo)
-        yStar = [ cpx.solution.get_values(y_ilo[j]) for j in range(inp.nI)]
+        yStar = np.asarray(cpx.solution.get_values(worker.flat_y)).reshape(
+                inp.nI, inp.nP)
 
         # get interior point
-        yTilde = [[_alpha*yTilde[j][t] + (1.0-_alpha)*yStar[j][t] for t in
-        range(inp.nP)] for j in range(inp.nI)]
+        yTilde = _alpha*yTilde + (1.0-_alpha)*yStar
 
-        yy = [ [min(1.0, _lambda*yStar[j][t] + (1.0-_lambda)*yTilde[j][t] +
-        _delta) for t in range(inp.nP)] for j in range(inp.nI)]
+        yy = np.minimum(1.0, _lambda*yStar + (1.0-_lambda)*yTilde + _delta)
 
         cutType, zSub = worker.solveSubPrimal(inp, yy, zHat, y_ilo, z_ilo)
         #  cutType, zSub = worker.solveSubDual(inp, yy, zHat, y_ilo, z_ilo)
 
+        # with lambda = 1 and delta = 0 the cut is separated at the LP solution
+        # itself: if it does not cut it off, the LP bound cannot improve
+        if _lambda == 1.0 and _delta == 0.0:
+            if worker.cutViolation(yStar.ravel(), zHat) <= _VIOL:
+                break
+
         #  if nrIter % 5 == 0:
         # NOTE: removing these constraints does not seem useful
         #  if stopping:
@@ -1420,14 +1479,16 @@ def newIOCycle(cpx, worker, y_ilo, z_ilo, inp):
 
         if cutType > 0:
             nrConstr = cpx.linear_constraints.get_num()
-            constrName = "inout." + str(globalProgr)
+            constrName = f"inout.{globalProgr}"
             globalProgr += 1
             #  print("adding ", constrName)
-            inout.append(constrName)
+            #  unnamed rows are tracked by their index
+            inout.append(constrName if debugCuts else nrConstr)
             cpx.linear_constraints.add(lin_expr = [worker.cutLhs],
                                        senses   = "L",
                                        rhs      = [worker.cutRhs],
-                                       names    = [constrName])
+                                       names    = [constrName] if debugCuts
+                                                  else None)
 
         else:
             print("something wrong with cutType !!!")
@@ -1448,65 +1509,79 @@ def fixingScheme(cpx, inp, y_ilo, ub, lb):
 
     fix2Zero = []
     print("Current ub = ", ub)
-    cpxClone = cplex.Cplex(cpx)
-    cpxClone.set_problem_type(cpxClone.problem_type.LP)
-    cpxClone.set_results_stream(None)
-    cpxClone.set_log_stream(None)
-    cpxClone.write("clone.lp")
-    cpxClone.solve()
-    #  lb = cpxClone.solution.get_objective_value()
+    # solve the LP relaxation of the master in place (no clone), then turn
+    # it back into a MILP
+    cpx.set_problem_type(cpx.problem_type.LP)
+    cpx.set_results_stream(None)
+    cpx.set_log_stream(None)
+    if debug:
+        cpx.write("fixingLP.lp")
+    cpx.solve()
+    #  lb = cpx.solution.get_objective_value()
     print("Current lb = ", lb)
     rc = []
     for j in range(inp.nI):
         aux = []
         for t in range(inp.nP):
-            aux.append(cpxClone.solution.get_reduced_costs(y_ilo[j][t]))
+            aux.append(cpx.solution.get_reduced_costs(y_ilo[j][t]))
         rc.append(aux)
     #  print("Reduced Costs = ", rc)
     for j in range(inp.nI):
         for t in range(inp.nP):
             if rc[j][t] + lb > ub:
                 print("** FIX {0} from {1} to 0".format(cpx.variables.get_names(y_ilo[j][t]),
-                cpxClone.solution.get_values(y_ilo[j][t])))
+                cpx.solution.get_values(y_ilo[j][t])))
                 fix2Zero.append(y_ilo[j][t])
                 input("aka")
 
+    restoreMILP(cpx, y_ilo)
+    #  cplex has no public getter for the streams: restore the ones that
+    #  every master gets (see cplexStream), rather than forcing stdout
+    cpx.set_results_stream(cplexStream())
+    cpx.set_log_stream(cplexStream())
+
     return fix2Zero
     
 
 def getUB(inp, zSub, ySol, zSol):
-    z = zSub
-    for j in range(inp.nI):
-        for t in range(inp.nP):
-            if ySol[j][t] > 1.0-_EPSI:
-                z += inp.f[j][t]
+    """
+    Upper bound of the setup plan ySol: fixed cost of the open setups plus the
+    subproblem value zSub. The check that zSol only produces in open periods
+    (z_jtr > 0 only if y_jt = 1) is skipped when running with python -O.
+
+    """
+    yOpen = np.asarray(ySol) > 1.0-_EPSI
+    z = zSub + float(inp.f[yOpen].sum())
 
     # is this feasible?
-    for j in range(inp.nI):
-        for t in range(inp.nP):
-            for r in range(t, inp.nP):
-                if zSol[j][t][r] > _EPSI:
-                    assert(ySol[j][t] > 1.0-_EPSI)
+    if __debug__:
+        #  only the z_jtr with r >= t (zSol may be ragged)
+        tt, rr = np.triu_indices(inp.nP)
+        zUp = np.array([[zSol[j][t][r] for t, r in zip(tt, rr)]
+                        for j in range(inp.nI)])
+        assert not np.any((zUp > _EPSI) & ~yOpen[:, tt])
     return z
 
 def getSolution(inp, cpx, y_ilo, z_ilo):
-    ySol = []
     zHat = cpx.solution.get_values(z_ilo)
     lb   = cpx.solution.get_objective_value()
-    for j in range(inp.nI):
-        aux = []
-        for t in range(inp.nP):
-            aux.append(cpx.solution.get_values(y_ilo[j][t]))
-        ySol.append(aux)
+    #  all the y_jt with a single call, as an (nI, nP) array
+    yFlat = [y for row in y_ilo for y in row]
+    ySol  = np.fromiter(cpx.solution.get_values(yFlat), dtype=np.float64,
+                        count=len(yFlat)).reshape(inp.nI, inp.nP)
 
     return lb, zHat, ySol
 
-def bendersCallbackScheme(inp,mip):
+def bendersCallbackScheme(inp, mip, state):
 
-    cpx = cplex.Cplex()
+    cpx = newCplex()
+    cpx.set_results_stream(cplexStream())
+    cpx.set_log_stream(cplexStream())
     createMaster(inp, cpx)
     worker = WorkerLPPrimal(inp)
     #  worker = WorkerLPDual(inp)
+    #  y_jt indices in cut order (item by item), shared by all the cuts
+    worker.flat_y = [y_ilo[j][t] for j in range(inp.nI) for t in range(inp.nP)]
 
     # Set up cplex parameters to use the cut callback for separating
     # Benders' cuts
@@ -1524,39 +1599,37 @@ def bendersCallbackScheme(inp,mip):
     #  cpx.read("inout-6-15.lp")
     newIOCycle(cpx, worker, y_ilo, z_ilo, inp)
     print("Problem type is ", cpx.problem_type[cpx.get_problem_type()])
-    cpx.set_problem_type(cpx.problem_type.MILP)
-    for j in range(inp.nI):
-        for t in range(inp.nP):
-            cpx.variables.set_types(y_ilo[j][t], cpx.variables.type.binary)
+    restoreMILP(cpx, y_ilo)
     print("Problem type is ", cpx.problem_type[cpx.get_problem_type()])
     #  cpx.write("inout-6-15.lp")
-    input("aka")
-    # making a clone of the master
+    if debug:
+        input("aka")
     # NOTE: remember that the callback does not modify the object "cpx", since
-    # cplex makes a working copy of the master. Thus, I create a clone to add
-    # all the cuts generated during the callback.
-    cpxMasterClone = cplex.Cplex(cpx)
-    cpxMasterClone.set_problem_type(cpx.problem_type.LP)
-    #  cpxMasterClone.set_results_stream(None)
-    #  cpxMasterClone.set_log_stream(None)
+    # cplex makes a working copy of the master. The cuts generated during the
+    # callback are not stored anywhere else (a clone of the master used to be
+    # created for this, but it was never filled.)
 
     # register LAZY callback
     lazyBenders        = cpx.register_callback(BendersLazyConsCallback)
     lazyBenders.cpx    = cpx
-    lazyBenders.cpxMasterClone = cpxMasterClone
     lazyBenders.inp    = inp
     #  lazyBenders.mip    = mip
     lazyBenders.z_ilo  = z_ilo
     lazyBenders.y_ilo  = y_ilo
+    lazyBenders.y_flat = worker.flat_y
+    lazyBenders.nI     = inp.nI
+    lazyBenders.nP     = inp.nP
     lazyBenders.worker = worker
     lazyBenders.solved = 0
     lazyBenders.rc     = []
     lazyBenders.nIter  = 0
+    lazyBenders.printEvery = 100
     lazyBenders.bestLB = -_INFTY
     lazyBenders.bestUB =  _INFTY
+    lazyBenders.yPool  = state.yPool
 
 
-    startTime = time.time()
+    startTime = time.perf_counter()
     # Solve the model
     cpx.solve()
 
@@ -1565,18 +1638,34 @@ def bendersCallbackScheme(inp,mip):
     print("Solution status: ", solution.status[solution.get_status()])
     print("Objective value: ", solution.get_objective_value())
 
-    print("Thus time is ", time.time() - startTime)
+    print("Thus time is ", time.perf_counter() - startTime)
     
 
 
+def bendersNative(inp, mip, state):
+    """
+    Solve the SPL reformulation using the Benders algorithm of cplex (full
+    strategy: the setup variables go to the master, the production variables
+    to the subproblem.) Cuts are generated inside cplex, without any Python
+    callback.
+
+    """
+    cpx = mip.cpx
+    cpx.parameters.benders.strategy.set(
+        cpx.parameters.benders.strategy.values.full)
+    mip.solve(inp, state, withPrinting = 1, display = 4 if verbose else 0)
+
+
 def bendersDual(inp):
 
-    cpx = cplex.Cplex()
-    #  cpx.set_results_stream(None)
-    #  cpx.set_log_stream(None)
+    cpx = newCplex()
+    cpx.set_results_stream(cplexStream())
+    cpx.set_log_stream(cplexStream())
     createMaster(inp, cpx)
     #  worker = WorkerLPDual(inp)
     worker = WorkerLPPrimal(inp)
+    #  y_jt indices in cut order (item by item), shared by all the cuts
+    worker.flat_y = [y_ilo[j][t] for j in range(inp.nI) for t in range(inp.nP)]
     setCpxParameters(cpx)
 
     #  cpx.read("inout-6-15.lp")
@@ -1589,62 +1678,82 @@ def bendersDual(inp):
 
     #  cpx.read("inout-6-15.lp")
     #
-    cpx.set_problem_type(cpx.problem_type.MILP)
-    for j in range(inp.nI):
-        for t in range(inp.nP):
-            cpx.variables.set_types(y_ilo[j][t], cpx.variables.type.binary)
+    restoreMILP(cpx, y_ilo)
     print("Problem type is ", cpx.problem_type[cpx.get_problem_type()])
-    input("aka")
+    if debug:
+        input("aka")
 
     stopping = False
     nIters = 0
     nrCuts = 0
     ubBest = _INFTY
     bestLB = -_INFTY
+    #  the first masters are solved with a loose gap, tightened at every
+    #  iteration down to _GAP, so that the optimality proof is done on a
+    #  master with cuts (and only as tightly as the stopping test needs)
+    mipGap = 0.10
+    yCut   = set() #  keys (y as uint8 bytes) of the plans already cut
     print("*"*80)
     print("Staring BENDERS Cycle")
     print("*"*80)
 
     while not stopping:
         nIters += 1
-        cpx.write("master.lp")
+        if debug:
+            cpx.write("master.lp")
+        cpx.parameters.mip.tolerances.mipgap.set(mipGap)
         cpx.solve() # solve current Master
-        bestLB, zHat, ySol = getSolution(inp, cpx, y_ilo, z_ilo)
-        print("[{0}] Current MASTER solution (lb) :: {1}".format(nIters, bestLB))
-
+        masterObj, zHat, ySol = getSolution(inp, cpx, y_ilo, z_ilo)
+        #  with a gap, the incumbent value is not a lower bound: use the bound
+        bestLB = max(bestLB, cpx.solution.MIP.get_best_objective())
+        logger.info("[%d] Current MASTER solution (lb) :: %s", nIters, bestLB)
+
+        #  a plan already cut gives no new cut (its cut is tight at y): solve
+        #  the master again with a tighter gap, or stop if it is the final one
+        yKey = np.rint(ySol).astype(np.uint8).tobytes()
+        if yKey in yCut:
+            stopping = mipGap <= _GAP
+            mipGap = max(_GAP, mipGap - 0.05)
+            continue
+        yCut.add(yKey)
+
+        #  one LP for all items and periods (coupled by the capacity rows),
+        #  i.e., there are no independent subproblems to solve in parallel
         #  cutType, zSub = worker.solveSubDual(inp, ySol, zHat, y_ilo, z_ilo)
         cutType, zSub = worker.solveSubPrimal(inp, ySol, zHat, y_ilo, z_ilo)
-        cutName = "cut." + str(nrCuts)
+        cutName = f"cut.{nrCuts}"
 
         if cutType == 1:
-            print("\t Adding feasibiity cut = ", cutName)
+            logger.info("\t Adding feasibiity cut =  %s", cutName)
         elif cutType == 2:
-            print("\t Adding optimality cut = ", cutName, "[ub = ", ubBest,"]")
-            fixedCost = bestLB - zHat
+            logger.info("\t Adding optimality cut =  %s [ub =  %s ]", cutName,
+                        ubBest)
+            fixedCost = masterObj - zHat
             ub = fixedCost + zSub
             if ub < ubBest:
                 ubBest = ub
 
         nrCuts += 1
 
+        # NOTE: one cut per subproblem solve. The cut is not copied to other
+        # periods or items: its coefficients m_jt*lambda_t + sum_r d_jr*eps_jtr
+        # depend on the demand, capacity and setup data of each (j,t), and the
+        # horizon is not periodic, so a shifted or permuted cut is not valid.
+        # Cuts are not buffered and added in batches either: without this cut
+        # the next master solve would return the same y (and the same cut.)
         cpx.linear_constraints.add(lin_expr = [worker.cutLhs],
                                   senses   = ["L"],
                                   rhs      = [worker.cutRhs],
-                                  names    = [cutName])
+                                  names    = [cutName] if debugCuts else None)
 
 
         if nIters % 10 == 0:
+            logger.info(_SUMMARY_FMT, nrCuts, ubBest, bestLB)
 
-            print("-"*30)
-            print("Summary BENDERS status :: ")
-            print("Tot Nr. Cuts so far = ", nrCuts)
-            print("Best ub = \t", ubBest)
-            print("Best lb = \t", bestLB)
-            print("-"*30)
-            print("\n")
-
-        if ubBest - bestLB < _EPSI:
+        #  bestLB is the best bound of the master, valid whatever its gap
+        if (ubBest - bestLB)/max(abs(ubBest), 1e-10) < _GAP:
             stopping = True
+        mipGap = max(_GAP, mipGap - 0.05)
 
 
 def main(argv):
@@ -1660,26 +1769,21 @@ def main(argv):
 
     With respect to the type of algorithms that can be used, we have:
 
-        1.  Benders Decomposition
+        1.  Benders Decomposition (one tree, cuts in a lazy callback; with -t,
+            one master MIP per cut)
         2.  Lagrangean Relaxation
         3.  Dantzig-Wolfe
         4.  Cplex MIP solver
 
     """
-    global yPool #  contains all the solutions found by CM added as cuts
-    yPool = []
-    global ubBest
-    global yBest
-    yBest = []
-    ubBest = _INFTY
-
-    global startTime
         #  outfile.write("{0:20s} {1:20.5f} {2:25s} {3:20.5f} {4:20.7f} {5:20.7f}\n".
         #                format(inputfile, zOpt, stat, lb, gap, zTime))
 
     parseCommandLine(argv)
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING,
+                        format="%(message)s", stream=sys.stdout)
     inp = Instance(inputfile)
-    startTime = time.time()
+    state = BendersState(startTime=time.perf_counter())
     printParameters()
 
     #  mip       = MIPReformulation(inp)
@@ -1689,16 +1793,21 @@ def main(argv):
     if algo == 4: #  Cplex MIP solver
         #  mip       = MIP(inp)
         mip       = MIPReformulation(inp)
-        mip.solve(inp, withPrinting = 1, display = 4)
-        exit(104)
-    if algo == 3: # Cplex with callbacks
-        mip       = MIPReformulation(inp)
+        mip.solve(inp, state, withPrinting = 1, display = 4 if verbose else 0)
+        sys.exit(104)
+    if algo in (1, 3): # Cplex with callbacks
         #  bendersAlgo(inp, mip)
-        bendersCallbackScheme(inp, mip)
-    if algo == 1: # Cplex with callbacks
-        mip       = MIPReformulation(inp)
-        #  bendersAlgo(inp, mip)
-        bendersDual(inp)
+        # NOTE: the cuts are separated in a lazy constraint callback within a
+        # single branch and bound tree; with -t (multi-tree), bendersDual
+        # re-solves the master MIP from scratch after adding each cut.
+        if algo == 1 and multiTree:
+            bendersDual(inp)
+        else:
+            mip = MIPReformulation(inp)
+            if nativeBenders:
+                bendersNative(inp, mip, state)
+            else:
+                bendersCallbackScheme(inp, mip, state)
 
 
 if __name__ == "__main__":